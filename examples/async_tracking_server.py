@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Async Tracking Endpoints
+========================
+
+Serves only the hot /track/open and /track/click endpoints of
+complete_tracking_system.py on an ASGI stack, so pixel fetches and
+redirects never wait on a synchronous worker. The dashboard and API stay
+on the Flask app.
+
+Events are handed to the same in-process queue and background writer as
+the Flask app, so a request only decodes its path, enqueues a row and
+responds. Set ENCRYPTION_KEY so both servers use the same Fernet key.
+
+Requirements:
+pip install quart hypercorn uvloop
+
+Usage:
+    hypercorn async_tracking_server:track_app --bind 0.0.0.0:5001 \
+        --workers 4 --worker-class uvloop
+"""
+
+from quart import Quart, Response, redirect, request
+from sqlalchemy.exc import SQLAlchemyError
+
+from complete_tracking_system import (
+    PIXEL_DATA, PIXEL_ETAG, PIXEL_HEADERS, PIXEL_NOT_MODIFIED_HEADERS, app, db,
+    tracking_service, get_tracking_result, start_tracking_event_writer,
+    stop_tracking_event_writer)
+
+track_app = Quart(__name__)
+
+
+@track_app.before_serving
+async def startup():
+    """Create the tables and start the batched event writer"""
+    # Hypercorn has no master process hook, so every worker runs this. When
+    # another worker creates a table between the existence check and
+    # CREATE TABLE, the second pass finds the tables and creates the rest
+    with app.app_context():
+        try:
+            db.create_all()
+        except SQLAlchemyError:
+            db.create_all()
+    start_tracking_event_writer()
+
+
+@track_app.after_serving
+async def shutdown():
+    """Write the events still queued before the server exits"""
+    stop_tracking_event_writer()
+
+
+def get_request_data() -> dict:
+    """Client information attached to the tracking event"""
+    return {
+        "user_agent": request.headers.get('User-Agent'),
+        "user_ip": request.remote_addr,
+        "referrer": request.headers.get('Referer')
+    }
+
+
+@track_app.route('/track/open/<encoded_path>')
+async def track_open(encoded_path):
+    """Handle open tracking requests"""
+    # Decoding is cached and only takes microseconds, so it runs inline
+    # rather than paying for a thread hand-off
+    try:
+        tracking_result = get_tracking_result(
+            encoded_path, get_request_data(), is_open=True
+        )
+        tracking_service.record_tracking_event(tracking_result)
+    except Exception as e:
+        track_app.logger.error("Open tracking error: %s", e)
+
+    # Return the pixel anyway to avoid broken images
+    if request.if_none_match.contains(PIXEL_ETAG):
+        return Response(b"", status=304, headers=PIXEL_NOT_MODIFIED_HEADERS)
+    return Response(PIXEL_DATA, headers=PIXEL_HEADERS)
+
+
+@track_app.route('/track/click/<path:encoded_path>')
+async def track_click(encoded_path):
+    """Handle click tracking requests"""
+    try:
+        tracking_result = get_tracking_result(
+            encoded_path, get_request_data(), is_open=False
+        )
+        tracking_service.record_tracking_event(tracking_result)
+    except Exception as e:
+        track_app.logger.error("Click tracking error: %s", e)
+        return Response("Invalid tracking link", status=404)
+
+    if not tracking_result.tracked_url:
+        return Response("Invalid tracking link", status=404)
+    return redirect(tracking_result.tracked_url)
+
+
+if __name__ == '__main__':
+    track_app.run(host='0.0.0.0', port=5001)
@@ -11,20 +11,30 @@ This example demonstrates a complete email tracking implementation with:
 - Analytics and reporting
 
 Requirements:
-pip install pytracking[all] flask sqlalchemy flask-sqlalchemy requests matplotlib plotly
+pip install pytracking[all] flask sqlalchemy flask-sqlalchemy requests orjson matplotlib plotly
 """
 
+import atexit
+import concurrent.futures
+import functools
+import hashlib
 import os
-import json
+import queue
+import threading
 import time
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional
 
 import pytracking
 from cryptography.fernet import Fernet
-from flask import Flask, request, redirect, Response, render_template, jsonify, url_for
+import orjson
+from flask import Flask, request, redirect, Response, render_template, stream_with_context, url_for
 from flask_sqlalchemy import SQLAlchemy
-from sqlalchemy import func, desc
+from sqlalchemy import case, desc, func, insert, select, update
+from sqlalchemy import event as sa_event
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import raiseload, selectinload
+from sqlalchemy.pool import QueuePool
 import requests
 
 # Flask App Setup
@@ -32,11 +42,48 @@ app = Flask(__name__)
 app.config['SECRET_KEY'] = 'your-secret-key-change-this'
 app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///email_tracking.db'
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+# JSON columns go through orjson
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+    'pool_pre_ping': True,
+    'json_serializer': lambda obj: orjson.dumps(obj).decode(),
+    'json_deserializer': orjson.loads
+}
+DATABASE_URL = make_url(app.config['SQLALCHEMY_DATABASE_URI'])
+USE_SQLITE = DATABASE_URL.get_backend_name() == 'sqlite'
+if USE_SQLITE:
+    # SQLite connections may be used from the writer and request threads.
+    # SQLAlchemy 1.4 gives file databases a NullPool, which reconnects and
+    # reruns the PRAGMAs below for every session; pool them as 2.0 does
+    app.config['SQLALCHEMY_ENGINE_OPTIONS']['connect_args'] = {'check_same_thread': False}
+    if DATABASE_URL.database not in (None, '', ':memory:'):
+        app.config['SQLALCHEMY_ENGINE_OPTIONS']['poolclass'] = QueuePool
+else:
+    # Pooled connections so the tracking writer and dashboard readers do
+    # not queue on a single connection
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'].update(pool_size=20, max_overflow=40)
+    if DATABASE_URL.get_driver_name() == 'psycopg2':
+        # psycopg2 sends each batch of tracking events in a single round trip;
+        # other PostgreSQL drivers reject this argument
+        app.config['SQLALCHEMY_ENGINE_OPTIONS']['executemany_mode'] = 'values_plus_batch'
+
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    """Use WAL so dashboard reads proceed while tracking events are written"""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA mmap_size=268435456")
+    cursor.close()
 
 db = SQLAlchemy(app)
 
-# Generate encryption key (store securely in production)
-ENCRYPTION_KEY = Fernet.generate_key()
+if USE_SQLITE:
+    with app.app_context():
+        sa_event.listen(db.engine, "connect", set_sqlite_pragmas)
+
+# Generate encryption key (store securely in production). Processes that
+# decode each other's links, e.g. async_tracking_server.py, must share it
+ENCRYPTION_KEY = os.environ.get('ENCRYPTION_KEY') or Fernet.generate_key()
 
 # PyTracking Configuration
 TRACKING_CONFIG = pytracking.Configuration(
@@ -47,6 +94,58 @@ TRACKING_CONFIG = pytracking.Configuration(
     default_metadata={"app": "email_tracker", "version": "1.0"}
 )
 
+# Tracking events are queued by the request handlers and written in batches
+# by a background thread so pixel/redirect responses never wait on the DB
+EVENT_BATCH_SIZE = 100
+EVENT_FLUSH_INTERVAL_MS = 500
+EVENT_STREAM_KEEPALIVE_SECONDS = 15
+# Each open event stream holds a worker thread, so streams end after this long
+# and EventSource reconnects, resuming from Last-Event-ID
+EVENT_STREAM_MAX_SECONDS = 300
+EVENT_STREAM_RETRY_MS = 1000
+_event_queue = queue.Queue()
+# Queued by stop_tracking_event_writer() to make the writer return
+_STOP_WRITER = object()
+# Started on the first queued event, so every way of serving the app writes
+# its events; guarded so concurrent requests start only one writer
+_event_writer = None
+_event_writer_lock = threading.Lock()
+# Notified after each committed batch so event streams wake up. Streams
+# compare the count of committed batches so one committed between their
+# query and their wait is not missed
+_events_written = threading.Condition()
+_events_written_count = 0
+
+EMAILS_PER_PAGE = 50
+
+# Dashboards poll the read-only API endpoints, so their JSON bodies are
+# kept for a few seconds: {key: (expires_at, body, etag)}
+API_CACHE_TTL_SECONDS = 5
+API_CACHE_MAX_ENTRIES = 1024
+_api_cache = {}
+
+# Webhooks are forwarded from a thread pool over a shared session so the
+# request handler returns immediately and connections are reused
+ANALYTICS_WEBHOOK_URL = os.environ.get('ANALYTICS_WEBHOOK_URL')
+_webhook_pool = concurrent.futures.ThreadPoolExecutor(max_workers=8)
+_webhook_session = requests.Session()
+
+# The tracking pixel never changes, so fetch it once at import. Caches may
+# store it but must revalidate on every open (no-cache), so each open still
+# reaches the server, which answers a matching ETag with an empty 304
+PIXEL_DATA, PIXEL_MIME = pytracking.get_open_tracking_pixel()
+PIXEL_ETAG = hashlib.blake2b(PIXEL_DATA, digest_size=16).hexdigest()
+PIXEL_HEADERS = {
+    'Content-Type': PIXEL_MIME,
+    'Content-Length': str(len(PIXEL_DATA)),
+    'Cache-Control': 'private, no-cache',
+    'ETag': f'"{PIXEL_ETAG}"'
+}
+PIXEL_NOT_MODIFIED_HEADERS = {
+    'Cache-Control': 'private, no-cache',
+    'ETag': f'"{PIXEL_ETAG}"'
+}
+
 # Database Models
 class Campaign(db.Model):
     """Email campaign model"""
@@ -78,6 +177,10 @@ class Email(db.Model):
     
     # Relationships
     events = db.relationship('TrackingEvent', backref='email', lazy=True)
+    
+    __table_args__ = (
+        db.Index('ix_email_campaign_opened', 'campaign_id', 'opened'),
+    )
 
     def __repr__(self):
         return f'<Email {self.recipient_email}>'
@@ -87,6 +190,8 @@ class TrackingEvent(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     event_type = db.Column(db.String(20), nullable=False)  # 'open' or 'click'
     timestamp = db.Column(db.DateTime, default=datetime.utcnow)
+    # Plain DATE copy of timestamp so daily stats can use an index
+    event_date = db.Column(db.Date, default=lambda: datetime.utcnow().date())
     
     # Foreign keys
     email_id = db.Column(db.Integer, db.ForeignKey('email.id'), nullable=False)
@@ -97,8 +202,15 @@ class TrackingEvent(db.Model):
     user_agent = db.Column(db.Text)
     user_ip = db.Column(db.String(45))
     
-    # Metadata (stored as JSON)
-    metadata = db.Column(db.Text)
+    # Metadata, stored natively as JSON in the "metadata" column. The
+    # attribute cannot be named metadata, which is reserved for the table
+    # metadata on declarative models
+    event_metadata = db.Column('metadata', db.JSON)
+    
+    __table_args__ = (
+        db.Index('ix_te_camp_type_date', 'campaign_id', 'event_type', 'event_date'),
+        db.Index('ix_te_email_timestamp', 'email_id', 'timestamp'),
+    )
 
     def __repr__(self):
         return f'<TrackingEvent {self.event_type} at {self.timestamp}>'
@@ -110,6 +222,15 @@ class EmailTrackingService:
     def __init__(self):
         self.config = TRACKING_CONFIG
     
+    @staticmethod
+    @functools.lru_cache(maxsize=64)
+    def get_html_template(html_content: str):
+        """Parse a campaign's HTML once; only the metadata differs per recipient.
+        Templates are keyed by the HTML itself, and the least recently used
+        ones are dropped"""
+        from pytracking.html import TrackingHTMLTemplate
+        return TrackingHTMLTemplate(html_content)
+    
     def create_campaign(self, name: str, subject: Optional[str] = None) -> Campaign:
         """Create a new email campaign"""
         campaign = Campaign(name=name, subject=subject)
@@ -117,40 +238,55 @@ class EmailTrackingService:
         db.session.commit()
         return campaign
     
-    def prepare_email(self, html_content: str, recipient_email: str, 
-                     campaign_id: int, recipient_name: Optional[str] = None) -> tuple:
-        """Prepare an HTML email with tracking links and pixels"""
-        
-        # Create email record
-        email = Email(
+    def _build_email_row(self, recipient_email: str, campaign_id: int,
+                         recipient_name: Optional[str] = None) -> Email:
+        """Build an email record without adding or committing it"""
+        return Email(
             recipient_email=recipient_email,
             recipient_name=recipient_name,
             campaign_id=campaign_id
         )
-        db.session.add(email)
-        db.session.flush()  # Get the ID
-        
+    
+    def _render_tracked_html(self, html_content: str, email: Email) -> str:
+        """Render the campaign HTML with tracking for a flushed email record"""
         # Metadata for tracking
         metadata = {
             "email_id": email.id,
-            "campaign_id": campaign_id,
-            "recipient_email": recipient_email,
+            "campaign_id": email.campaign_id,
+            "recipient_email": email.recipient_email,
             "timestamp": int(time.time())
         }
         
-        # Add tracking to HTML using pytracking's HTML adapter
-        from pytracking.html import adapt_html
-        tracked_html = adapt_html(
-            html_content,
-            extra_metadata=metadata,
-            configuration=self.config
+        # Add tracking to HTML using a template parsed once per campaign
+        return self.get_html_template(html_content).render(
+            metadata, configuration=self.config
         )
+    
+    def prepare_email(self, html_content: str, recipient_email: str, 
+                     campaign_id: int, recipient_name: Optional[str] = None) -> tuple:
+        """Prepare an HTML email with tracking links and pixels"""
+        prepared = self.prepare_emails_bulk(
+            html_content, [(recipient_email, recipient_name)], campaign_id
+        )
+        return prepared[0]
+    
+    def prepare_emails_bulk(self, html_content: str, recipients: List[tuple],
+                            campaign_id: int) -> List[tuple]:
+        """Prepare tracked HTML emails for (email, name) recipients in one transaction"""
+        emails = [
+            self._build_email_row(recipient_email, campaign_id, recipient_name)
+            for recipient_email, recipient_name in recipients
+        ]
+        db.session.add_all(emails)
+        db.session.flush()  # Get the IDs
+        
+        prepared = [(email, self._render_tracked_html(html_content, email)) for email in emails]
         
         db.session.commit()
-        return email, tracked_html
+        return prepared
     
-    def record_tracking_event(self, tracking_result: pytracking.TrackingResult):
-        """Record a tracking event in the database"""
+    def record_tracking_event(self, tracking_result: pytracking.TrackingResult) -> Optional[Dict]:
+        """Queue a tracking event for the background writer"""
         if not tracking_result.metadata:
             return None
             
@@ -161,79 +297,244 @@ class EmailTrackingService:
         if not email_id:
             return None
         
-        # Create tracking event
-        event = TrackingEvent(
-            event_type='open' if tracking_result.is_open_tracking else 'click',
-            email_id=email_id,
-            campaign_id=campaign_id,
-            tracked_url=tracking_result.tracked_url,
-            user_agent=tracking_result.request_data.get('user_agent') if tracking_result.request_data else None,
-            user_ip=tracking_result.request_data.get('user_ip') if tracking_result.request_data else None,
-            metadata=json.dumps(tracking_result.metadata)
+        request_data = tracking_result.request_data or {}
+        now = datetime.utcnow()
+        row = {
+            'event_type': 'open' if tracking_result.is_open_tracking else 'click',
+            'email_id': email_id,
+            'campaign_id': campaign_id,
+            'tracked_url': tracking_result.tracked_url,
+            'user_agent': request_data.get('user_agent'),
+            'user_ip': request_data.get('user_ip'),
+            'metadata': metadata,
+            'timestamp': now,
+            'event_date': now.date()
+        }
+        if _event_writer is None or not _event_writer.is_alive():
+            start_tracking_event_writer()
+        _event_queue.put(row)
+        return row
+
+# Built once; SQLAlchemy reuses its compiled form for every batch. A Core
+# insert on the table takes rows keyed by column name ("metadata") on both
+# SQLAlchemy 1.4 and 2.0, unlike an ORM insert keyed by attribute name
+_INSERT_TRACKING_EVENT = insert(TrackingEvent.__table__)
+
+def flush_tracking_events(batch: List[Dict]):
+    """Insert a batch of queued events and update the matching emails"""
+    global _events_written_count
+    opened_at = {}
+    click_deltas = {}
+    for row in batch:
+        email_id = row['email_id']
+        if row['event_type'] == 'open':
+            opened_at.setdefault(email_id, row['timestamp'])
+        else:
+            click_deltas[email_id] = click_deltas.get(email_id, 0) + 1
+    
+    db.session.execute(_INSERT_TRACKING_EVENT, batch)
+    
+    # Only emails that were never opened get their first open time set,
+    # each to its own earliest open in the batch
+    if opened_at:
+        db.session.execute(
+            update(Email)
+            .where(Email.id.in_(list(opened_at)), Email.first_opened_at.is_(None))
+            .values(opened=True, first_opened_at=case(opened_at, value=Email.id))
         )
-        db.session.add(event)
+    
+    # One UPDATE per distinct click increment rather than one per email
+    emails_by_delta = {}
+    for email_id, delta in click_deltas.items():
+        emails_by_delta.setdefault(delta, []).append(email_id)
+    for delta, email_ids in emails_by_delta.items():
+        db.session.execute(
+            update(Email)
+            .where(Email.id.in_(email_ids))
+            .values(clicks=Email.clicks + delta)
+        )
+    
+    db.session.commit()
+    
+    with _events_written:
+        _events_written_count += 1
+        _events_written.notify_all()
+
+def write_tracking_events(batch: List[Dict]):
+    """Flush a batch; if it fails, retry its events one by one so a single
+    bad row (e.g. for a deleted email) does not drop the others"""
+    with app.app_context():
+        try:
+            flush_tracking_events(batch)
+            return
+        except Exception as e:
+            db.session.rollback()
+            if len(batch) == 1:
+                app.logger.error("Dropped tracking event %s: %s", batch[0], e)
+                return
+            app.logger.warning("Tracking event batch failed, retrying events one by one: %s", e)
         
-        # Update email record
-        email = Email.query.get(email_id)
-        if email:
-            if tracking_result.is_open_tracking and not email.opened:
-                email.opened = True
-                email.first_opened_at = datetime.utcnow()
-            elif tracking_result.is_click_tracking:
-                email.clicks += 1
+        for row in batch:
+            try:
+                flush_tracking_events([row])
+            except Exception as e:
+                db.session.rollback()
+                app.logger.error("Dropped tracking event %s: %s", row, e)
+
+def tracking_event_writer(batch_size: int = EVENT_BATCH_SIZE,
+                          flush_interval_ms: int = EVENT_FLUSH_INTERVAL_MS):
+    """Drain the event queue until stopped, flushing every batch_size events
+    or flush_interval_ms milliseconds, whichever comes first"""
+    flush_interval = flush_interval_ms / 1000.0
+    stopping = False
+    while not stopping:
+        row = _event_queue.get()
+        if row is _STOP_WRITER:
+            break
+        batch = [row]
+        deadline = time.monotonic() + flush_interval
+        while len(batch) < batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                row = _event_queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if row is _STOP_WRITER:
+                stopping = True
+                break
+            batch.append(row)
         
-        db.session.commit()
-        return event
+        # An unexpected error (e.g. a failed rollback) must not end the
+        # thread, or every later event would sit in the queue unwritten
+        try:
+            write_tracking_events(batch)
+        except Exception:
+            app.logger.exception("Dropped %d tracking events", len(batch))
+
+def start_tracking_event_writer() -> threading.Thread:
+    """Start the background thread that writes queued tracking events, or
+    return the one already running; a writer that died is replaced"""
+    global _event_writer
+    with _event_writer_lock:
+        if _event_writer is not None and _event_writer.is_alive():
+            return _event_writer
+        if _event_writer is not None:
+            app.logger.warning("Tracking event writer stopped unexpectedly, restarting it")
+        _event_writer = threading.Thread(
+            target=tracking_event_writer, name='tracking-event-writer', daemon=True
+        )
+        _event_writer.start()
+        return _event_writer
+
+def stop_tracking_event_writer(timeout: float = 10.0):
+    """Stop the writer after its current batch and write every event still
+    queued, so restarts and deploys do not drop tracking events"""
+    global _event_writer
+    with _event_writer_lock:
+        writer, _event_writer = _event_writer, None
+    if writer is None:
+        return
+    _event_queue.put(_STOP_WRITER)
+    writer.join(timeout)
+    
+    # Events queued after the stop marker, or left if the writer timed out
+    batch = []
+    while True:
+        try:
+            row = _event_queue.get_nowait()
+        except queue.Empty:
+            break
+        if row is not _STOP_WRITER:
+            batch.append(row)
+    for start in range(0, len(batch), EVENT_BATCH_SIZE):
+        write_tracking_events(batch[start:start + EVENT_BATCH_SIZE])
+
+# Write whatever is still queued when the process exits
+atexit.register(stop_tracking_event_writer)
 
 # Initialize the service
 tracking_service = EmailTrackingService()
 
+@functools.lru_cache(maxsize=8192)
+def decode_tracking_path(encoded_path: str, is_open: bool) -> pytracking.TrackingResult:
+    """Decode a tracking path once; email clients often refetch the same pixel"""
+    if is_open:
+        return pytracking.get_open_tracking_result(encoded_path, configuration=TRACKING_CONFIG)
+    return pytracking.get_click_tracking_result(encoded_path, configuration=TRACKING_CONFIG)
+
+def get_tracking_result(encoded_path: str, request_data: Dict, is_open: bool) -> pytracking.TrackingResult:
+    """Build a tracking result for this request from the cached decoded path"""
+    decoded = decode_tracking_path(encoded_path, is_open)
+    # The decoded result is shared by every hit on this path, so callers get
+    # their own copy of its metadata to add fields to
+    return pytracking.TrackingResult(
+        is_open_tracking=decoded.is_open_tracking,
+        is_click_tracking=decoded.is_click_tracking,
+        tracked_url=decoded.tracked_url,
+        webhook_url=decoded.webhook_url,
+        metadata=dict(decoded.metadata),
+        request_data=request_data,
+        timestamp=int(time.time())
+    )
+
+# orjson serializes datetimes natively; stored times are naive UTC
+ORJSON_OPTIONS = orjson.OPT_NAIVE_UTC
+
+def ojsonify(payload, status: int = 200) -> Response:
+    """JSON response serialized with orjson"""
+    return Response(orjson.dumps(payload, option=ORJSON_OPTIONS), status=status, mimetype='application/json')
+
+def pixel_response() -> Response:
+    """Return the tracking pixel, or an empty 304 to a cache revalidating it"""
+    if request.if_none_match.contains(PIXEL_ETAG):
+        return Response(status=304, headers=PIXEL_NOT_MODIFIED_HEADERS)
+    return Response(PIXEL_DATA, headers=PIXEL_HEADERS)
+
+def get_request_data() -> Dict:
+    """Client information attached to the tracking event, read straight
+    from the WSGI environ rather than through the header wrappers"""
+    environ = request.environ
+    return {
+        "user_agent": environ.get('HTTP_USER_AGENT'),
+        "user_ip": environ.get('REMOTE_ADDR'),
+        "referrer": environ.get('HTTP_REFERER')
+    }
+
 # Flask Routes - Tracking Endpoints
-@app.route('/track/open/<path:encoded_path>')
+# Tracking tokens are URL-safe base64 and never contain "/", so the open
+# route uses the plain string converter rather than path
+@app.route('/track/open/<encoded_path>')
 def track_open(encoded_path):
     """Handle open tracking requests"""
-    request_data = {
-        "user_agent": request.headers.get('User-Agent'),
-        "user_ip": request.remote_addr,
-        "referrer": request.headers.get('Referer')
-    }
-    
-    try:
-        # Decode tracking data
-        tracking_result = pytracking.get_open_tracking_result(
-            encoded_path,
-            request_data=request_data,
-            configuration=TRACKING_CONFIG
-        )
-        
-        # Record the event
-        tracking_service.record_tracking_event(tracking_result)
-        
-        # Return tracking pixel
-        pixel_data, mime_type = pytracking.get_open_tracking_pixel()
-        return Response(pixel_data, mimetype=mime_type)
-        
-    except Exception as e:
-        app.logger.error(f"Open tracking error: {e}")
-        # Return pixel anyway to avoid broken images
-        pixel_data, mime_type = pytracking.get_open_tracking_pixel()
-        return Response(pixel_data, mimetype=mime_type)
+    request_data = get_request_data()
+    
+    def record_open():
+        try:
+            tracking_result = get_tracking_result(
+                encoded_path, request_data, is_open=True
+            )
+            tracking_service.record_tracking_event(tracking_result)
+        except Exception as e:
+            app.logger.error("Open tracking error: %s", e)
+    
+    # Send the pixel first and decode once the response has been written,
+    # so email clients never wait on decryption. Invalid links still get
+    # the pixel to avoid broken images
+    response = pixel_response()
+    response.call_on_close(record_open)
+    return response
 
 @app.route('/track/click/<path:encoded_path>')
 def track_click(encoded_path):
     """Handle click tracking requests"""
-    request_data = {
-        "user_agent": request.headers.get('User-Agent'),
-        "user_ip": request.remote_addr,
-        "referrer": request.headers.get('Referer')
-    }
+    request_data = get_request_data()
     
     try:
         # Decode tracking data
-        tracking_result = pytracking.get_click_tracking_result(
-            encoded_path,
-            request_data=request_data,
-            configuration=TRACKING_CONFIG
+        tracking_result = get_tracking_result(
+            encoded_path, request_data, is_open=False
         )
         
         # Record the event
@@ -246,33 +547,92 @@ def track_click(encoded_path):
             return Response("Invalid tracking link", status=404)
         
     except Exception as e:
-        app.logger.error(f"Click tracking error: {e}")
+        app.logger.error("Click tracking error: %s", e)
         return Response("Invalid tracking link", status=404)
 
+def forward_to_analytics(data: Dict):
+    """Forward a webhook payload to the analytics platform"""
+    try:
+        _webhook_session.post(
+            ANALYTICS_WEBHOOK_URL, json=data,
+            timeout=TRACKING_CONFIG.webhook_timeout_seconds
+        )
+    except requests.RequestException as e:
+        app.logger.error("Analytics forwarding error: %s", e)
+
 @app.route('/webhook/tracking', methods=['POST'])
 def webhook_tracking():
     """Handle webhook notifications (for external systems)"""
     try:
-        data = request.get_json()
-        app.logger.info(f"Webhook received: {data}")
+        data = orjson.loads(request.get_data())
+        app.logger.info("Webhook received: %s", data)
         
-        # You can forward this to other systems like analytics platforms
-        # send_to_analytics_platform(data)
+        # Forward to other systems like analytics platforms without
+        # holding up the worker
+        if ANALYTICS_WEBHOOK_URL:
+            _webhook_pool.submit(forward_to_analytics, data)
         
-        return jsonify({"status": "received"}), 200
+        return ojsonify({"status": "received"}, 202)
     except Exception as e:
-        app.logger.error(f"Webhook error: {e}")
-        return jsonify({"error": str(e)}), 400
+        app.logger.error("Webhook error: %s", e)
+        return ojsonify({"error": str(e)}, 400)
+
+def count_events(event_type: str):
+    """SQL expression counting the tracking events of one type"""
+    return func.coalesce(func.sum(case((TrackingEvent.event_type == event_type, 1), else_=0)), 0)
+
+def get_campaign_totals(campaign_id: int):
+    """Email, unique open, open and click totals for a campaign in one query"""
+    return db.session.execute(
+        select(
+            select(func.count(Email.id))
+            .where(Email.campaign_id == campaign_id)
+            .scalar_subquery().label('emails'),
+            select(func.count(Email.id))
+            .where(Email.campaign_id == campaign_id, Email.opened.is_(True))
+            .scalar_subquery().label('unique_opens'),
+            count_events('open').label('opens'),
+            count_events('click').label('clicks')
+        ).select_from(TrackingEvent).where(TrackingEvent.campaign_id == campaign_id)
+    ).one()
+
+def get_campaign_counts(campaign_ids: List[int]) -> Dict:
+    """Email, open and click counts for several campaigns in one query"""
+    if not campaign_ids:
+        return {}
+    rows = db.session.execute(
+        select(
+            Campaign.id,
+            select(func.count(Email.id))
+            .where(Email.campaign_id == Campaign.id)
+            .scalar_subquery().label('emails'),
+            select(func.count(TrackingEvent.id))
+            .where(TrackingEvent.campaign_id == Campaign.id, TrackingEvent.event_type == 'open')
+            .scalar_subquery().label('opens'),
+            select(func.count(TrackingEvent.id))
+            .where(TrackingEvent.campaign_id == Campaign.id, TrackingEvent.event_type == 'click')
+            .scalar_subquery().label('clicks')
+        ).where(Campaign.id.in_(campaign_ids))
+    ).all()
+    return {row.id: row for row in rows}
 
 # Flask Routes - Web UI
 @app.route('/')
 def dashboard():
     """Main dashboard"""
-    # Get summary statistics
-    total_campaigns = Campaign.query.count()
-    total_emails = Email.query.count()
-    total_opens = TrackingEvent.query.filter_by(event_type='open').count()
-    total_clicks = TrackingEvent.query.filter_by(event_type='click').count()
+    # Get summary statistics in a single round-trip
+    stats = db.session.execute(
+        select(
+            select(func.count(Campaign.id)).scalar_subquery().label('campaigns'),
+            select(func.count(Email.id)).scalar_subquery().label('emails'),
+            count_events('open').label('opens'),
+            count_events('click').label('clicks')
+        ).select_from(TrackingEvent)
+    ).one()
+    total_campaigns = stats.campaigns
+    total_emails = stats.emails
+    total_opens = stats.opens
+    total_clicks = stats.clicks
     
     # Recent campaigns
     recent_campaigns = Campaign.query.order_by(desc(Campaign.created_at)).limit(5).all()
@@ -282,13 +642,15 @@ def dashboard():
                          total_emails=total_emails,
                          total_opens=total_opens,
                          total_clicks=total_clicks,
-                         recent_campaigns=recent_campaigns)
+                         recent_campaigns=recent_campaigns,
+                         campaign_counts=get_campaign_counts([c.id for c in recent_campaigns]))
 
 @app.route('/campaigns')
 def campaigns():
     """List all campaigns"""
     campaigns_list = Campaign.query.order_by(desc(Campaign.created_at)).all()
-    return render_template('campaigns.html', campaigns=campaigns_list)
+    return render_template('campaigns.html', campaigns=campaigns_list,
+                         campaign_counts=get_campaign_counts([c.id for c in campaigns_list]))
 
 @app.route('/campaigns/<int:campaign_id>')
 def campaign_detail(campaign_id):
@@ -296,21 +658,33 @@ def campaign_detail(campaign_id):
     campaign = Campaign.query.get_or_404(campaign_id)
     
     # Get campaign statistics
-    emails = Email.query.filter_by(campaign_id=campaign_id).all()
-    opens = TrackingEvent.query.filter_by(campaign_id=campaign_id, event_type='open').count()
-    clicks = TrackingEvent.query.filter_by(campaign_id=campaign_id, event_type='click').count()
+    totals = get_campaign_totals(campaign_id)
+    
+    # Only load the page of emails being rendered, with their events
+    # eagerly loaded so the template cannot trigger a query per row
+    page = max(request.args.get('page', 1, type=int), 1)
+    emails = Email.query.filter_by(campaign_id=campaign_id).options(
+        selectinload(Email.events), raiseload('*')
+    ).order_by(Email.id).limit(EMAILS_PER_PAGE).offset((page - 1) * EMAILS_PER_PAGE).all()
+    pages = max((totals.emails + EMAILS_PER_PAGE - 1) // EMAILS_PER_PAGE, 1)
     
     # Calculate rates
-    open_rate = (opens / len(emails) * 100) if emails else 0
-    click_rate = (clicks / len(emails) * 100) if emails else 0
+    open_rate = (totals.opens / totals.emails * 100) if totals.emails else 0
+    click_rate = (totals.clicks / totals.emails * 100) if totals.emails else 0
+    unique_open_rate = (totals.unique_opens / totals.emails * 100) if totals.emails else 0
     
     return render_template('campaign_detail.html',
                          campaign=campaign,
                          emails=emails,
-                         opens=opens,
-                         clicks=clicks,
+                         total_emails=totals.emails,
+                         opens=totals.opens,
+                         clicks=totals.clicks,
+                         unique_opens=totals.unique_opens,
                          open_rate=open_rate,
-                         click_rate=click_rate)
+                         click_rate=click_rate,
+                         unique_open_rate=unique_open_rate,
+                         page=page,
+                         pages=pages)
 
 @app.route('/create_campaign', methods=['GET', 'POST'])
 def create_campaign():
@@ -360,54 +734,119 @@ def send_test_email():
     return render_template('send_test_email.html', campaigns=campaigns_list)
 
 # API Routes
-@app.route('/api/campaigns/<int:campaign_id>/stats')
-def api_campaign_stats(campaign_id):
-    """API endpoint for campaign statistics"""
-    campaign = Campaign.query.get_or_404(campaign_id)
+def cached_json_response(key: tuple, build) -> Response:
+    """Serve build()'s JSON from a short TTL cache, answering 304 on a matching ETag"""
+    now = time.monotonic()
+    cached = _api_cache.get(key)
+    if cached is None or cached[0] <= now:
+        body = orjson.dumps(build(), option=ORJSON_OPTIONS)
+        cached = (now + API_CACHE_TTL_SECONDS, body, hashlib.blake2b(body, digest_size=16).hexdigest())
+        if len(_api_cache) >= API_CACHE_MAX_ENTRIES:
+            _api_cache.clear()
+        _api_cache[key] = cached
+    
+    response = Response(cached[1], mimetype='application/json')
+    response.set_etag(cached[2])
+    return response.make_conditional(request)
+
+def get_campaign_daily_stats(campaign_id: int) -> Dict:
+    """Daily open and click counts for a campaign over the last 30 days"""
+    Campaign.query.get_or_404(campaign_id)
     
     # Get daily stats for the last 30 days
-    thirty_days_ago = datetime.utcnow() - timedelta(days=30)
+    thirty_days_ago = (datetime.utcnow() - timedelta(days=30)).date()
     
-    daily_opens = db.session.query(
-        func.date(TrackingEvent.timestamp).label('date'),
+    # One grouped query served by the (campaign_id, event_type, event_date) index
+    daily_counts = db.session.query(
+        TrackingEvent.event_type,
+        TrackingEvent.event_date,
         func.count(TrackingEvent.id).label('count')
     ).filter(
         TrackingEvent.campaign_id == campaign_id,
-        TrackingEvent.event_type == 'open',
-        TrackingEvent.timestamp >= thirty_days_ago
-    ).group_by(func.date(TrackingEvent.timestamp)).all()
+        TrackingEvent.event_date >= thirty_days_ago
+    ).group_by(
+        TrackingEvent.event_type, TrackingEvent.event_date
+    ).order_by(TrackingEvent.event_date).all()
     
-    daily_clicks = db.session.query(
-        func.date(TrackingEvent.timestamp).label('date'),
-        func.count(TrackingEvent.id).label('count')
-    ).filter(
-        TrackingEvent.campaign_id == campaign_id,
-        TrackingEvent.event_type == 'click',
-        TrackingEvent.timestamp >= thirty_days_ago
-    ).group_by(func.date(TrackingEvent.timestamp)).all()
+    daily_opens = [d for d in daily_counts if d.event_type == 'open']
+    daily_clicks = [d for d in daily_counts if d.event_type == 'click']
     
-    return jsonify({
+    return {
         'campaign_id': campaign_id,
-        'daily_opens': [{'date': str(d.date), 'count': d.count} for d in daily_opens],
-        'daily_clicks': [{'date': str(d.date), 'count': d.count} for d in daily_clicks]
-    })
+        'daily_opens': [{'date': d.event_date, 'count': d.count} for d in daily_opens],
+        'daily_clicks': [{'date': d.event_date, 'count': d.count} for d in daily_clicks]
+    }
 
-@app.route('/api/events')
-def api_recent_events():
-    """API endpoint for recent tracking events"""
-    limit = request.args.get('limit', 50, type=int)
-    events = TrackingEvent.query.order_by(desc(TrackingEvent.timestamp)).limit(limit).all()
-    
-    return jsonify([{
+@app.route('/api/campaigns/<int:campaign_id>/stats')
+def api_campaign_stats(campaign_id):
+    """API endpoint for campaign statistics"""
+    return cached_json_response(
+        ('stats', campaign_id), lambda: get_campaign_daily_stats(campaign_id)
+    )
+
+def event_to_dict(event: TrackingEvent) -> Dict:
+    """API representation of a tracking event"""
+    return {
         'id': event.id,
         'type': event.event_type,
-        'timestamp': event.timestamp.isoformat(),
+        'timestamp': event.timestamp,
         'campaign_id': event.campaign_id,
         'email_id': event.email_id,
         'tracked_url': event.tracked_url,
         'user_agent': event.user_agent,
-        'user_ip': event.user_ip
-    } for event in events])
+        'user_ip': event.user_ip,
+        'metadata': event.event_metadata
+    }
+
+def get_recent_events(limit: int) -> List[Dict]:
+    """The most recent tracking events"""
+    events = TrackingEvent.query.order_by(desc(TrackingEvent.timestamp)).limit(limit).all()
+    return [event_to_dict(event) for event in events]
+
+@app.route('/api/events')
+def api_recent_events():
+    """API endpoint for recent tracking events"""
+    limit = request.args.get('limit', 50, type=int)
+    return cached_json_response(('events', limit), lambda: get_recent_events(limit))
+
+@app.route('/api/events/stream')
+def api_event_stream():
+    """Server-sent events for tracking events newer than last_id"""
+    # EventSource sends Last-Event-ID when reconnecting
+    last_id = request.headers.get('Last-Event-ID', type=int)
+    if last_id is None:
+        last_id = request.args.get('last_id', type=int)
+    if last_id is None:
+        last_id = db.session.scalar(select(func.max(TrackingEvent.id))) or 0
+    
+    @stream_with_context
+    def generate():
+        nonlocal last_id
+        deadline = time.monotonic() + EVENT_STREAM_MAX_SECONDS
+        yield f"retry: {EVENT_STREAM_RETRY_MS}\n\n"
+        while time.monotonic() < deadline:
+            seen = _events_written_count
+            events = TrackingEvent.query.filter(
+                TrackingEvent.id > last_id
+            ).order_by(TrackingEvent.id).limit(EVENT_BATCH_SIZE).all()
+            # Do not hold a read transaction open while waiting
+            db.session.close()
+            
+            for event in events:
+                last_id = event.id
+                yield f"id: {event.id}\ndata: {orjson.dumps(event_to_dict(event), option=ORJSON_OPTIONS).decode()}\n\n"
+            
+            timeout = min(EVENT_STREAM_KEEPALIVE_SECONDS, deadline - time.monotonic())
+            if len(events) < EVENT_BATCH_SIZE and timeout > 0:
+                # Yield outside the lock so a slow client cannot block the writer
+                with _events_written:
+                    notified = _events_written.wait_for(
+                        lambda: _events_written_count != seen, timeout=timeout
+                    )
+                if not notified:
+                    yield ": keepalive\n\n"
+    
+    return Response(generate(), mimetype='text/event-stream', headers={'Cache-Control': 'no-cache'})
 
 # Analytics Functions
 def get_campaign_analytics(campaign_id: int) -> Dict:
@@ -416,10 +855,7 @@ def get_campaign_analytics(campaign_id: int) -> Dict:
     if not campaign:
         return {}
     
-    emails = Email.query.filter_by(campaign_id=campaign_id).all()
-    opens = TrackingEvent.query.filter_by(campaign_id=campaign_id, event_type='open').count()
-    clicks = TrackingEvent.query.filter_by(campaign_id=campaign_id, event_type='click').count()
-    unique_opens = Email.query.filter_by(campaign_id=campaign_id, opened=True).count()
+    totals = get_campaign_totals(campaign_id)
     
     # Top clicked URLs
     top_urls = db.session.query(
@@ -433,12 +869,12 @@ def get_campaign_analytics(campaign_id: int) -> Dict:
     
     return {
         'campaign': campaign,
-        'total_emails': len(emails),
-        'total_opens': opens,
-        'unique_opens': unique_opens,
-        'total_clicks': clicks,
-        'open_rate': (unique_opens / len(emails) * 100) if emails else 0,
-        'click_rate': (clicks / len(emails) * 100) if emails else 0,
+        'total_emails': totals.emails,
+        'total_opens': totals.opens,
+        'unique_opens': totals.unique_opens,
+        'total_clicks': totals.clicks,
+        'open_rate': (totals.unique_opens / totals.emails * 100) if totals.emails else 0,
+        'click_rate': (totals.clicks / totals.emails * 100) if totals.emails else 0,
         'top_urls': [(url, count) for url, count in top_urls]
     }
 
@@ -469,11 +905,9 @@ def create_sample_data():
     </html>
     """
     
-    for email, name in sample_recipients:
-        email_obj, tracked_html = tracking_service.prepare_email(
-            html_content, email, campaign.id, name
-        )
-        print(f"Created email for {email} with ID {email_obj.id}")
+    prepared = tracking_service.prepare_emails_bulk(html_content, sample_recipients, campaign.id)
+    for email_obj, tracked_html in prepared:
+        print(f"Created email for {email_obj.recipient_email} with ID {email_obj.id}")
 
 if __name__ == '__main__':
     # Create database tables
@@ -485,8 +919,14 @@ if __name__ == '__main__':
             create_sample_data()
             print("Sample data created!")
     
+    start_tracking_event_writer()
+    
     print("Starting Email Tracking System...")
     print("Dashboard: http://localhost:5000")
     print("API Docs: Check the /api/ endpoints")
     
-    app.run(debug=True, host='0.0.0.0', port=5000)
+    # The development server is for local use only; the debugger and
+    # reloader are opt-in. In production run:
+    #   gunicorn -c gunicorn.conf.py complete_tracking_system:app
+    debug = os.environ.get('FLASK_DEBUG') == '1'
+    app.run(debug=debug, use_reloader=debug, threaded=True, host='0.0.0.0', port=5000)
@@ -0,0 +1,47 @@
+"""
+Gunicorn Configuration
+======================
+
+Production settings for complete_tracking_system.py. Threaded workers
+keep many tracking pixel requests in flight per process; the batched
+event writer does its database I/O off the request threads.
+
+Usage:
+    gunicorn -c gunicorn.conf.py complete_tracking_system:app
+"""
+
+import multiprocessing
+import os
+
+bind = os.environ.get('BIND', '0.0.0.0:5000')
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count()))
+worker_class = 'gthread'
+threads = 32
+worker_connections = 2000
+keepalive = 5
+# Import the app once in the master; workers share the loaded modules
+preload_app = True
+
+
+def on_starting(server):
+    """Create the tables once, in the master, before any worker starts"""
+    from complete_tracking_system import app, db
+
+    with app.app_context():
+        db.create_all()
+        # Forked workers must not share the master's pooled connections
+        db.engine.dispose()
+
+
+def post_worker_init(worker):
+    """Start the event writer in every worker"""
+    from complete_tracking_system import start_tracking_event_writer
+
+    start_tracking_event_writer()
+
+
+def worker_exit(server, worker):
+    """Write the events still queued before the worker exits"""
+    from complete_tracking_system import stop_tracking_event_writer
+
+    stop_tracking_event_writer()
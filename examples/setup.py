@@ -13,11 +13,14 @@ Usage:
 """
 
 import argparse
+import base64
 import os
 import subprocess
 import sys
 from pathlib import Path
 
+MIN_PYTHON_VERSION = (3, 6)
+
 def run_command(command, description):
     """Run a shell command and handle errors"""
     print(f"📦 {description}...")
@@ -32,8 +35,8 @@ def run_command(command, description):
 
 def check_python_version():
     """Check if Python version is compatible"""
-    if sys.version_info < (3, 6):
-        print("❌ Python 3.6+ is required")
+    if sys.version_info < MIN_PYTHON_VERSION:
+        print("❌ Python {}.{}+ is required".format(*MIN_PYTHON_VERSION))
         sys.exit(1)
     print(f"✅ Python {sys.version_info.major}.{sys.version_info.minor}.{sys.version_info.micro} detected")
 
@@ -47,7 +50,8 @@ def install_dependencies(full_install=False):
         "flask",
         "flask-sqlalchemy",
         "requests",
-        "cryptography"
+        "orjson",
+        "cryptography>=42.0.0"
     ]
     
     # Full installation with optional dependencies
@@ -68,7 +72,7 @@ def install_dependencies(full_install=False):
     deps = full_deps if full_install else basic_deps
     
     for dep in deps:
-        if not run_command(f"pip install {dep}", f"Installing {dep}"):
+        if not run_command(f"pip install '{dep}'", f"Installing {dep}"):
             print(f"⚠️  Warning: Failed to install {dep}")
     
     print("✅ Dependencies installation completed")
@@ -94,6 +98,11 @@ def generate_secret_key():
     import secrets
     return secrets.token_hex(32)
 
+def generate_encryption_key():
+    """Generate a Fernet key (URL-safe base64 of 32 random bytes) without
+    importing cryptography, which may not be installed yet"""
+    return base64.urlsafe_b64encode(os.urandom(32)).decode()
+
 def create_env_file():
     """Create .env file with configuration"""
     env_content = f"""# PyTracking Email Tracking System Configuration
@@ -113,7 +122,7 @@ BASE_CLICK_TRACKING_URL=http://localhost:5000/track/click/
 WEBHOOK_URL=http://localhost:5000/webhook/tracking
 
 # Security
-ENCRYPTION_KEY={generate_secret_key()}
+ENCRYPTION_KEY={generate_encryption_key()}
 
 # Email Service Provider (configure as needed)
 # SENDGRID_API_KEY=your_sendgrid_api_key
@@ -144,7 +153,8 @@ flask>=2.0.0
 flask-sqlalchemy>=2.5.1
 sqlalchemy>=1.4.0
 requests>=2.25.0
-cryptography>=3.4.0
+orjson>=3.6.0
+cryptography>=42.0.0  # OpenSSL 3 wheels with AES-NI/SHA-NI
 
 # Optional dependencies for full functionality
 matplotlib>=3.5.0
@@ -208,7 +218,7 @@ HEALTHCHECK --interval=30s --timeout=10s --start-period=5s --retries=3 \\
     CMD curl -f http://localhost:5000/ || exit 1
 
 # Run application
-CMD ["gunicorn", "--bind", "0.0.0.0:5000", "--workers", "4", "complete_tracking_system:app"]
+CMD ["gunicorn", "-c", "gunicorn.conf.py", "complete_tracking_system:app"]
 """
     
     with open('Dockerfile', 'w') as f:
@@ -314,7 +324,7 @@ User=www-data
 Group=www-data
 WorkingDirectory={os.getcwd()}
 Environment=PATH={os.getcwd()}/venv/bin
-ExecStart={os.getcwd()}/venv/bin/gunicorn --bind 0.0.0.0:5000 --workers 4 complete_tracking_system:app
+ExecStart={os.getcwd()}/venv/bin/gunicorn -c gunicorn.conf.py complete_tracking_system:app
 ExecReload=/bin/kill -s HUP $MAINPID
 Restart=always
 RestartSec=3
@@ -373,34 +383,44 @@ def run_tests():
     except Exception as e:
         print(f"⚠️  Test warning: {e}")
 
+NEXT_STEPS = """
+============================================================
+🎉 Setup completed successfully!
+============================================================
+
+📋 Next steps:
+1. Start the application:
+   python complete_tracking_system.py
+
+2. Open your browser:
+   http://localhost:5000
+
+3. Try the CLI tool:
+   python tracking_cli.py --help
+   python tracking_cli.py test
+
+4. For production deployment:
+   - Edit .env file with your configuration
+   - Set up your email service provider
+   - Configure database (PostgreSQL/MySQL)
+   - Use Docker or systemd service
+
+📚 Documentation:
+   - README.md for complete documentation
+   - complete_tracking_system.py for web interface
+   - tracking_cli.py for command-line usage
+
+🔧 Configuration files created:
+   - .env (environment variables)
+   - requirements.txt (dependencies)
+   - Dockerfile & docker-compose.yml (Docker)
+   - pytracking.service (systemd)
+   - nginx.conf (reverse proxy)
+"""
+
 def print_next_steps():
     """Print instructions for next steps"""
-    print("\n" + "="*60)
-    print("🎉 Setup completed successfully!")
-    print("="*60)
-    print("\n📋 Next steps:")
-    print("1. Start the application:")
-    print("   python complete_tracking_system.py")
-    print("\n2. Open your browser:")
-    print("   http://localhost:5000")
-    print("\n3. Try the CLI tool:")
-    print("   python tracking_cli.py --help")
-    print("   python tracking_cli.py test")
-    print("\n4. For production deployment:")
-    print("   - Edit .env file with your configuration")
-    print("   - Set up your email service provider")
-    print("   - Configure database (PostgreSQL/MySQL)")
-    print("   - Use Docker or systemd service")
-    print("\n📚 Documentation:")
-    print("   - README.md for complete documentation")
-    print("   - complete_tracking_system.py for web interface")
-    print("   - tracking_cli.py for command-line usage")
-    print("\n🔧 Configuration files created:")
-    print("   - .env (environment variables)")
-    print("   - requirements.txt (dependencies)")
-    print("   - Dockerfile & docker-compose.yml (Docker)")
-    print("   - pytracking.service (systemd)")
-    print("   - nginx.conf (reverse proxy)")
+    sys.stdout.write(NEXT_STEPS)
 
 def main():
     parser = argparse.ArgumentParser(description="Setup PyTracking Email Tracking System")
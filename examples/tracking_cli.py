@@ -13,10 +13,14 @@ Usage:
     python tracking_cli.py generate-link "https://example.com" --campaign-id 1
     python tracking_cli.py stats --campaign-id 1
     python tracking_cli.py decode-url "encoded_tracking_url_path"
+
+Set ENCRYPTION_KEY to the server's key to generate and decode its links.
 """
 
 import argparse
+import functools
 import json
+import os
 import sys
 import time
 from datetime import datetime, timedelta
@@ -24,21 +28,29 @@ from pathlib import Path
 from typing import Optional, Dict, Union
 
 import pytracking
-from cryptography.fernet import Fernet
 
 # Configuration
-TRACKING_CONFIG = pytracking.Configuration(
-    base_open_tracking_url="http://localhost:5000/track/open/",
-    base_click_tracking_url="http://localhost:5000/track/click/",
-    webhook_url="http://localhost:5000/webhook/tracking",
-    encryption_bytestring_key=Fernet.generate_key(),
-)
+@functools.lru_cache(maxsize=None)
+def get_tracking_config() -> pytracking.Configuration:
+    """Build the tracking configuration on first use; --help never needs it.
+    Set ENCRYPTION_KEY to decode links generated by the server or an earlier
+    run, otherwise a new key is generated for this process"""
+    encryption_key = os.environ.get('ENCRYPTION_KEY')
+    if not encryption_key:
+        from cryptography.fernet import Fernet
+        encryption_key = Fernet.generate_key()
+    return pytracking.Configuration(
+        base_open_tracking_url="http://localhost:5000/track/open/",
+        base_click_tracking_url="http://localhost:5000/track/click/",
+        webhook_url="http://localhost:5000/webhook/tracking",
+        encryption_bytestring_key=encryption_key,
+    )
 
 class TrackingCLI:
     """CLI interface for email tracking operations"""
     
     def __init__(self):
-        self.config = TRACKING_CONFIG
+        self.config = get_tracking_config()
     
     def create_campaign(self, name: str, subject: Optional[str] = None) -> Dict:
         """Create a new campaign"""
@@ -66,14 +78,12 @@ class TrackingCLI:
     
     def generate_open_tracking_pixel(self, campaign_id: int, metadata: Optional[Dict] = None) -> str:
         """Generate an open tracking pixel URL"""
-        if metadata is None:
-            metadata = {}
-        
-        metadata.update({
+        metadata = {
+            **(metadata or {}),
             "campaign_id": campaign_id,
             "timestamp": int(time.time()),
             "type": "open"
-        })
+        }
         
         pixel_url = pytracking.get_open_tracking_url(
             metadata=metadata,
@@ -89,15 +99,13 @@ class TrackingCLI:
     
     def generate_click_tracking_link(self, original_url: str, campaign_id: int, metadata: Optional[Dict] = None) -> str:
         """Generate a click tracking link"""
-        if metadata is None:
-            metadata = {}
-        
-        metadata.update({
+        metadata = {
+            **(metadata or {}),
             "campaign_id": campaign_id,
             "timestamp": int(time.time()),
             "type": "click",
             "original_url": original_url
-        })
+        }
         
         tracking_url = pytracking.get_click_tracking_url(
             original_url,
@@ -1,3 +1,6 @@
+import re
+from uuid import uuid4
+
 from lxml import html
 
 from pytracking.tracking import (
@@ -34,32 +37,91 @@ def adapt_html(
     """
     configuration = get_configuration(configuration, kwargs)
 
-    tree = html.fromstring(html_text)
-
-    if click_tracking:
-        _replace_links(tree, extra_metadata, configuration)
-
-    if open_tracking:
-        _add_tracking_pixel(tree, extra_metadata, configuration)
-
-    new_html_text = html.tostring(
-        tree, include_meta_content_type=True, doctype=DOCTYPE)
+    template = TrackingHTMLTemplate(html_text, click_tracking, open_tracking)
 
-    return new_html_text.decode("utf-8")
+    return template.render(extra_metadata, configuration)
 
 
-def _replace_links(tree, extra_metadata, configuration):
-    for (element, attribute, link, pos) in tree.iterlinks():
-        if element.tag == "a" and attribute == "href" and _valid_link(link):
-            new_link = get_click_tracking_url(
-                link, extra_metadata, configuration)
-            element.attrib["href"] = new_link
-
+class TrackingHTMLTemplate(object):
+    """HTML that is parsed once and whose tracking links can then be rendered
+    many times with different metadata, e.g., once per recipient of the same
+    email.
+    """
 
-def _add_tracking_pixel(tree, extra_metadata, configuration):
-    url = get_open_tracking_url(extra_metadata, configuration)
-    pixel = html.Element("img", {"src": url})
-    tree.body.append(pixel)
+    def __init__(self, html_text, click_tracking=True, open_tracking=True):
+        """
+        :param html_text: The HTML to change (unicode or bytestring).
+        :param click_tracking: If links (<a href...>) must be changed.
+        :param open_tracking: If a transparent pixel must be added before the
+            closing body tag.
+        """
+        # Each tracking URL is replaced by a unique placeholder in the
+        # serialized HTML. Rendering only needs to join the text around them.
+        placeholder_prefix = "pytracking-{0}-".format(uuid4().hex)
+        self.links = []
+
+        tree = html.fromstring(html_text)
+
+        if click_tracking:
+            for (element, attribute, link, pos) in tree.iterlinks():
+                if element.tag == "a" and attribute == "href" and\
+                        _valid_link(link):
+                    element.attrib["href"] = "{0}{1}".format(
+                        placeholder_prefix, len(self.links))
+                    self.links.append(link)
+
+        if open_tracking:
+            pixel = html.Element(
+                "img", {"src": "{0}open".format(placeholder_prefix)})
+            tree.body.append(pixel)
+
+        html_template = html.tostring(
+            tree, include_meta_content_type=True,
+            doctype=DOCTYPE).decode("utf-8")
+
+        self.parts = re.split(
+            "{0}(\\d+|open)".format(placeholder_prefix), html_template)
+
+    def render(self, extra_metadata, configuration=None, **kwargs):
+        """Returns the HTML with tracking links encoding extra_metadata.
+
+        :param extra_metadata: A dict that can be json-encoded and that will
+            be encoded in the tracking link.
+        :param configuration: An optional Configuration instance.
+        :param kwargs: Optional configuration parameters. If provided with a
+            Configuration instance, the kwargs parameters will override the
+            Configuration parameters.
+        """
+        configuration = get_configuration(configuration, kwargs)
+
+        # re.split alternates text and captured placeholder names.
+        rendered = list(self.parts)
+        for index in range(1, len(rendered), 2):
+            name = rendered[index]
+            if name == "open":
+                url = get_open_tracking_url(extra_metadata, configuration)
+                rendered[index] = _serialize_url_attribute("img", "src", url)
+            else:
+                url = get_click_tracking_url(
+                    self.links[int(name)], extra_metadata, configuration)
+                rendered[index] = _serialize_url_attribute("a", "href", url)
+
+        return "".join(rendered)
+
+
+def _serialize_url_attribute(tag, attribute, url):
+    """Returns the URL as lxml writes it in a double-quoted attribute of the
+    serialized HTML, including the URI escaping libxml2 applies to href and
+    src attributes.
+    """
+    serialized = html.tostring(
+        html.Element(tag, {attribute: url})).decode("utf-8")
+    start = len("<{0} {1}=".format(tag, attribute))
+    quote = serialized[start]
+    value = serialized[start + 1:serialized.index(quote, start + 1)]
+    if quote != '"':
+        value = value.replace('"', "&quot;")
+    return value
 
 
 def _valid_link(link):
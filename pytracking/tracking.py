@@ -79,6 +79,10 @@ class Configuration(object):
             if key != "encryption_key":
                 new_config.__dict__[key] = deepcopy(value)
 
+        # The Fernet instance holds no per-call state so copies can share it
+        # instead of rebuilding the key.
+        new_config.encryption_key = self.encryption_key
+
         return new_config
 
     def merge_with_kwargs(self, kwargs):
@@ -92,7 +96,9 @@ class Configuration(object):
                 setattr(new_configuration, key, value)
 
         # In case a new encryption key was provided
-        new_configuration.cache_encryption_key()
+        if new_configuration.encryption_bytestring_key !=\
+                self.encryption_bytestring_key:
+            new_configuration.cache_encryption_key()
 
         return new_configuration
 
@@ -272,8 +278,11 @@ def get_configuration(configuration, kwargs):
     an API function).
 
     The kwargs parameters take precendence over the Configuration instance.
+    If no kwargs are given, the Configuration instance is returned as is.
     """
-    if configuration:
+    if configuration and not kwargs:
+        return configuration
+    elif configuration:
         configuration = configuration.merge_with_kwargs(kwargs)
     else:
         configuration = Configuration().merge_with_kwargs(kwargs)
@@ -6,6 +6,8 @@ from pytracking import (
     get_click_tracking_result, get_open_tracking_url,
     get_open_tracking_result)
 
+from pytracking.tracking import get_configuration
+
 from cryptography.fernet import Fernet
 
 DEFAULT_URL_TO_TRACK = "https://www.bob.com/hello-world/?token=valueééé"
@@ -123,3 +125,24 @@ def test_minimal_encrypted_get_click_tracking_url():
     assert tracking_result.metadata == expected_metadata
     assert tracking_result.is_click_tracking
     assert not tracking_result.is_open_tracking
+
+
+def test_merged_configuration_reuses_encryption_key():
+    configuration = Configuration(
+        base_open_tracking_url=DEFAULT_BASE_OPEN_TRACKING_URL,
+        encryption_bytestring_key=DEFAULT_ENCRYPTION_KEY)
+
+    assert get_configuration(configuration, {}) is configuration
+
+    new_configuration = get_configuration(
+        configuration, {"webhook_url": DEFAULT_WEBHOOK_URL})
+    assert new_configuration.encryption_key is configuration.encryption_key
+
+    new_key_configuration = get_configuration(
+        configuration, {"encryption_bytestring_key": Fernet.generate_key()})
+    assert new_key_configuration.encryption_key is not\
+        configuration.encryption_key
+
+    no_key_configuration = get_configuration(
+        configuration, {"encryption_bytestring_key": None})
+    assert no_key_configuration.encryption_key is None
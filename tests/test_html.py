@@ -35,6 +35,20 @@ TEST_HTML_EMAIL = """
 """
 
 
+TEST_SHORT_HTML_EMAIL = """<html><body>\
+<a href="http://www.example.com/">Link</a></body></html>"""
+
+NON_ASCII_BASE_CLICK_TRACKING_URL = "https://t.example.com/é/"
+
+NON_ASCII_BASE_OPEN_TRACKING_URL = "https://t.example.com/é/open/"
+
+EXPECTED_SHORT_HTML_EMAIL = (
+    '<!DOCTYPE html>\n<html><body><a href="https://t.example.com/%C3%A9/'
+    'eyJ1cmwiOiAiaHR0cDovL3d3dy5leGFtcGxlLmNvbS8iLCAibWV0YWRhdGEiOiB7Imlk'
+    'IjogMX19">Link</a><img src="https://t.example.com/%C3%A9/open/'
+    'eyJtZXRhZGF0YSI6IHsiaWQiOiAxfX0="></body></html>')
+
+
 DEFAULT_SETTINGS = {
     "webhook_url": DEFAULT_WEBHOOK_URL,
     "base_open_tracking_url": DEFAULT_BASE_OPEN_TRACKING_URL,
@@ -84,6 +98,40 @@ def test_adapt_html_open_only():
     assert links[2].attrib["href"] == "http://www.domain2.com"
 
 
+def test_adapt_html_escapes_tracking_urls():
+    new_html = tracking_html.adapt_html(
+        TEST_SHORT_HTML_EMAIL, {"id": 1},
+        base_open_tracking_url=NON_ASCII_BASE_OPEN_TRACKING_URL,
+        base_click_tracking_url=NON_ASCII_BASE_CLICK_TRACKING_URL)
+
+    assert new_html == EXPECTED_SHORT_HTML_EMAIL
+
+
+def test_tracking_html_template_render():
+    template = tracking_html.TrackingHTMLTemplate(TEST_SHORT_HTML_EMAIL)
+
+    new_html = template.render(
+        {"id": 1},
+        base_open_tracking_url=NON_ASCII_BASE_OPEN_TRACKING_URL,
+        base_click_tracking_url=NON_ASCII_BASE_CLICK_TRACKING_URL)
+    assert new_html == EXPECTED_SHORT_HTML_EMAIL
+
+    template = tracking_html.TrackingHTMLTemplate(TEST_HTML_EMAIL)
+    new_html = template.render(DEFAULT_METADATA, **DEFAULT_SETTINGS)
+
+    tree = html.fromstring(new_html)
+    _test_open_tracking(tree)
+    _test_click_tracking(tree)
+
+    other_html = template.render({"param1": "other"}, **DEFAULT_SETTINGS)
+    pixel_img = html.fromstring(other_html).xpath("//img")[-1]
+    open_url_path = get_open_tracking_url_path(
+        pixel_img.attrib["src"], **DEFAULT_SETTINGS)
+    open_result = get_open_tracking_result(
+        open_url_path, **DEFAULT_SETTINGS)
+    assert open_result.metadata["param1"] == "other"
+
+
 def _test_click_tracking(tree):
     links = tree.xpath("//a")
     first_link_url_path = get_click_tracking_url_path(